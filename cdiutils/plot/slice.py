@@ -6,9 +6,9 @@ import xrayutilities as xu
 import warnings
 
 from cdiutils.utils import (
-    nan_to_zero,
     extract_reduced_shape,
-    get_centred_slices
+    get_centred_slices,
+    get_masked_centred_slices
 )
 from cdiutils.plot.formatting import (
     get_figure_size,
@@ -149,14 +149,16 @@ def plot_slices(
         # params = {
         #     "vmin": vmin, "vmax": vmax, "cmap": cmap, "origin": origin, "norm": 
         # }
-        im = grid[i].matshow(
+        im = grid[i].imshow(
             to_plot,
+            interpolation="nearest",
             vmin=vmin,
             vmax=vmax,
             cmap=cmap,
             origin=origin,
             norm=norm,
-            alpha=None if alphas is None else alphas[i]
+            alpha=None if alphas is None else alphas[i],
+            rasterized=True
         )
 
         if data_stacking in ("vertical", "v"):
@@ -238,6 +240,7 @@ def plot_3d_volume_slices(
         suptitle: str = None,
         show: bool = True,
         return_fig: bool = False,
+        return_mappables: bool = False,
         show_cbar: bool = True,
         cbar_title: str = None,
         cbar_location: str = "top",
@@ -273,14 +276,23 @@ def plot_3d_volume_slices(
     :param suptitle: global title of the figure (str). Default: None.
     :param show: whether or not to show the figure (bool). If False, the
     figure is not displayed but returned.
+    :param return_mappables: whether to return the figure together with
+    the list of the images (three per *data), which can be passed to
+    update_volume_slices (bool). Default: False.
     :param data_stacking: stacking direction for the slice plot (str).
     Can only be "vertical" or "horizontal", default: "vertical".
     :param slice_names: the name of the slices (list of str). For each
     *data, three slices are plotted, this str are the name of each
     slice.
-    :return: figure if show is false.
+    :return: figure if show is false, (figure, images) if
+    return_mappables is True.
     """
 
+    # same default as matshow, without its tick set-up overhead
+    plot_params.setdefault("interpolation", "nearest")
+    # embed the images as rasters when saving to vector formats
+    plot_params.setdefault("rasterized", True)
+
     if figsize is None:
         if data_stacking in ("vertical", "v"):
             figsize = (18, 4 * len(data))
@@ -293,10 +305,12 @@ def plot_3d_volume_slices(
             print("norm provided, will not use log_scale.")
             log_scale = False            
     if norm is None:
+        # use data[0] rather than data, so numpy does not convert the
+        # tuple of arrays into a new stacked array
         if vmin is None:
-            vmin = None if do_sum or len(data) > 1 else np.nanmin(data)
+            vmin = None if do_sum or len(data) > 1 else np.nanmin(data[0])
         if vmax is None:
-            vmax = None if do_sum or len(data) > 1 else np.nanmax(data)
+            vmax = None if do_sum or len(data) > 1 else np.nanmax(data[0])
     else:
         vmin = vmax = None
 
@@ -326,60 +340,55 @@ def plot_3d_volume_slices(
         cbar_size=0.2 if show_cbar else None
     )
 
+    mappables = []
     for i, plot in enumerate(data):
         if log_scale:
-            norm = matplotlib.colors.LogNorm(plot.min(), plot.max())
-        if nan_supports is not None:
-            if isinstance(nan_supports, list):
-                plot = plot * nan_supports[i]
-            else:
-                plot = plot * nan_supports
+            norm = matplotlib.colors.LogNorm(
+                np.nanmin(plot), np.nanmax(plot)
+            )
         if not shapes:
             shape = plot.shape
         else:
             shape = shapes[i]
 
+        # the three planes (slices or sums) are computed once, before
+        # any plotting
+        planes = _get_volume_planes(
+            plot, shape, _select_nan_support(nan_supports, i), do_sum
+        )
+
         if data_stacking in ("vertical", "v"):
-            ind1 = 3 * i
-            ind2 = 3 * i + 1
-            ind3 = 3 * i + 2
+            indexes = (3 * i, 3 * i + 1, 3 * i + 2)
         else:
-            ind1 = i
-            ind2 = i + len(data)
-            ind3 = i + 2 * len(data)
-        im = grid[ind1].matshow(
-            np.sum(plot, axis=0) if do_sum else plot[shape[0]//2,],
-            cmap=cmap,
-            vmin=vmin,
-            vmax=vmax,
-            origin="lower",
-            aspect=aspect_ratios["yz"] if aspect_ratios else "auto",
-            norm=norm,
-            alpha=None if alphas is None else alphas[i][shape[0]//2,],
-            **plot_params
-        )
-        grid[ind2].matshow(
-            np.sum(plot, axis=1) if do_sum else plot[:, shape[1]//2, :],
-            cmap=cmap,
-            vmin=vmin,
-            vmax=vmax,
-            origin="lower",
-            aspect=aspect_ratios["xz"] if aspect_ratios else "auto",
-            norm=norm,
-            alpha=None if alphas is None else alphas[i][:, shape[1]//2, :],
-            **plot_params
-        )
-        grid[ind3].matshow(
-            np.sum(plot, axis=2) if do_sum else plot[:, :, shape[2]//2],
-            cmap=cmap,
-            vmin=vmin,
-            vmax=vmax,
-            origin="lower",
-            aspect=aspect_ratios["xy"] if aspect_ratios else "auto",
-            norm=norm,
-            alpha=None if alphas is None else alphas[i][:, :, shape[2]//2],
-            **plot_params
-        )
+            indexes = (i, i + len(data), i + 2 * len(data))
+        ind1, ind3 = indexes[0], indexes[2]
+
+        for ind, plane, plane_name, centred_slice in zip(
+                indexes,
+                planes,
+                ("yz", "xz", "xy"),
+                get_centred_slices(shape)
+        ):
+            mappables.append(
+                grid[ind].imshow(
+                    plane,
+                    cmap=cmap,
+                    vmin=vmin,
+                    vmax=vmax,
+                    origin="lower",
+                    aspect=(
+                        aspect_ratios[plane_name] if aspect_ratios
+                        else "auto"
+                    ),
+                    norm=norm,
+                    alpha=(
+                        None if alphas is None
+                        else alphas[i][centred_slice]
+                    ),
+                    **plot_params
+                )
+            )
+        im = mappables[-3]
 
         if data_stacking in ("vertical", "v"):
             grid[ind1].annotate(
@@ -446,9 +455,94 @@ def plot_3d_volume_slices(
     fig.suptitle(suptitle)
     if show:
         plt.show()
+    if return_mappables:
+        return fig, mappables
     return fig if return_fig else None
 
 
+def update_volume_slices(
+        mappables: list[matplotlib.image.AxesImage],
+        *data: list[np.ndarray],
+        shapes: list[tuple] = None,
+        nan_supports: list[np.ndarray] = None,
+        do_sum: bool = False,
+        vmin: float = None,
+        vmax: float = None
+) -> None:
+    """
+    Update a figure made with plot_3d_volume_slices with new data of the
+    same shapes, without rebuilding the figure. Only the image data are
+    replaced, which is much faster when called repeatedly, e.g. in
+    interactive loops.
+
+    :param mappables: the images returned by plot_3d_volume_slices
+    when return_mappables is True (list).
+    :param *data: the new 3D data (np.array), as many as initially
+    plotted.
+    :param shapes, nan_supports, do_sum: same as in
+    plot_3d_volume_slices.
+    :param vmin: the new minimum value (float) for the color scale. If
+    None, the former one is kept. Default: None.
+    :param vmax: the new maximum value (float) for the color scale. If
+    None, the former one is kept. Default: None.
+    """
+    if len(mappables) != 3 * len(data):
+        raise ValueError(
+            "mappables must hold three images for each of the *data."
+        )
+    for i, plot in enumerate(data):
+        planes = _get_volume_planes(
+            plot,
+            plot.shape if not shapes else shapes[i],
+            _select_nan_support(nan_supports, i),
+            do_sum
+        )
+        for image, plane in zip(mappables[3*i:3*i + 3], planes):
+            image.set_data(plane)
+            image.set_clim(vmin, vmax)
+    mappables[0].figure.canvas.draw_idle()
+
+
+def _select_nan_support(
+        nan_supports: list[np.ndarray] | np.ndarray,
+        index: int
+) -> np.ndarray:
+    """Return the nan support to apply to the index-th data."""
+    if isinstance(nan_supports, list):
+        return nan_supports[index]
+    return nan_supports
+
+
+def _get_volume_planes(
+        data: np.ndarray,
+        shape: tuple,
+        nan_support: np.ndarray = None,
+        do_sum: bool = False
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute the three 2D planes (central slices or sums) to display for
+    a 3D volume.
+    """
+    if do_sum:
+        if nan_support is not None:
+            data = data * nan_support
+        planes = (
+            np.sum(data, axis=0),
+            np.sum(data, axis=1),
+            np.sum(data, axis=2)
+        )
+    else:
+        # slice first, the support only needs to be applied to the three
+        # 2D planes and not to the whole volume
+        planes = get_masked_centred_slices(data, nan_support, shape)
+
+    # float32 is enough for display and halves the data matplotlib has
+    # to normalise
+    return tuple(
+        np.ascontiguousarray(p, dtype=np.float32) for p in planes
+    )
+
+
 def plot_support_contour(
         amplitudes,
         supports,
@@ -460,16 +554,57 @@ def plot_support_contour(
         contour_colors=("azure", "deepskyblue"),
         **kwargs
     ):
+    """
+    Plot the slices of the amplitudes of several scans, filtered by
+    their isosurfaces, with the contour of the reference support and of
+    the support of each scan overlaid.
+
+    :param amplitudes: the 3D amplitudes (dict of np.array) of the
+    scans, keyed by scan.
+    :param supports: the 3D binary supports (dict of np.array), keyed
+    by scan.
+    :param isosurfaces: the isosurface (dict of float) of each scan,
+    below which the amplitude is not displayed.
+    :param conditions: the label (dict of str) of each scan.
+    :param scan_ref: the scan whose support is the reference contour.
+    :param threshold: the minimum value (float) of the color scale.
+    :param contour_linewidths: the width of the contour lines (float).
+    :param contour_colors: the colours of the reference and of the scan
+    contours (tuple of str).
+    :param kwargs: other parameters passed to plot_3d_volume_slices,
+    except data_stacking and show: the planes are always stacked
+    horizontally and the figure is returned without being shown, so
+    that the contours can be added to it.
+    :return: the figure.
+    """
+    for forbidden in ("data_stacking", "show"):
+        if forbidden in kwargs:
+            raise ValueError(
+                f"'{forbidden}' cannot be provided to plot_support_contour, "
+                "the planes are stacked horizontally and the figure is "
+                "returned without being shown."
+            )
     scan_digits = list(amplitudes.keys())
-    
-    filtered_amplitudes = {
-        scan: np.where(amplitudes[scan] < isosurfaces[scan], np.nan, amplitudes[scan])
-    for scan in scan_digits
-    }
 
-    filtered_amp_fig = plot_3D_volume_slices(
+    # filter each scan into its own copy, which holds np.nan where the
+    # amplitude is below the isosurface, without stacking the volumes
+    filtered_amplitudes = {}
+    for scan in scan_digits:
+        filtered = np.array(
+            amplitudes[scan],
+            dtype=np.result_type(amplitudes[scan], float)
+        )
+        filtered[filtered < isosurfaces[scan]] = np.nan
+        filtered_amplitudes[scan] = filtered
+
+    # the contours are added below, axis by axis, assuming the planes
+    # are stacked horizontally, the figure must not be shown before
+    filtered_amp_fig = plot_3d_volume_slices(
         *filtered_amplitudes.values(),
-        titles=list(conditions.values()),
+        slice_labels=list(conditions.values()),
+        return_fig=True,
+        show=False,
+        data_stacking="horizontal",
         vmin=threshold,
         vmax=1,
         **kwargs
@@ -478,74 +613,104 @@ def plot_support_contour(
     support_ref = supports[scan_ref]
     shape = support_ref.shape
 
-    for i, ax in enumerate(filtered_amp_fig.axes):
-        if i < len(scan_digits):
-            X, Y = np.meshgrid(
-                np.arange(0, shape[2]), (np.arange(0, shape[1])))
-            ax.contour(
-                X,
-                Y,
-                support_ref[shape[0] // 2],
-                levels=[0, 1],
-                linewidths=contour_linewidths,
-                colors=contour_colors[0] ,
-
-            )
-            if i % len(scan_digits) != 0:
-                ax.contour(
-                    X,
-                    Y,
-                    supports[scan_digits[i]][shape[0] // 2],
-                    levels=[0, 1],
-                    linewidths=contour_linewidths,
-                    colors=contour_colors[1],
+    # the reference planes are identical for every scan, compute them
+    # once. No coordinates are given to contour, which then uses the
+    # pixel indices without building any meshgrid.
+    ref_planes = (
+        support_ref[shape[0] // 2],
+        support_ref[:, shape[1] // 2, :],
+        support_ref[..., shape[2] // 2]
+    )
+    # the reference contour of the xy plane uses its own levels
+    ref_levels = ([0, 1], [0, 1], [0, 0.1])
 
-                )
-        elif i < 2*len(scan_digits):
-            X, Y = np.meshgrid(np.arange(0, shape[2]), (np.arange(0, shape[0])))
-            ax.contour(
-                X,
-                Y,
-                support_ref[:, shape[1] // 2, :],
-                levels=[0, 1],
-                linewidths=contour_linewidths,
-                colors=contour_colors[0],
+    # mid-slices of the supports, computed once per scan and per plane
+    support_planes = {
+        scan: [support[s] for s in get_centred_slices(shape)]
+        for scan, support in supports.items()
+    }
 
-            )
-            if i % len(scan_digits) != 0:
+    # the axes are ordered plane by plane, each plane having one axis
+    # per scan
+    axes = filtered_amp_fig.axes
+    for j, (ref_plane, levels) in enumerate(zip(ref_planes, ref_levels)):
+        for k in range(len(scan_digits)):
+            ax = axes[j * len(scan_digits) + k]
+            rasterize_contour_set(
                 ax.contour(
-                    X,
-                    Y,
-                    supports[scan_digits[i%len(scan_digits)]][:, shape[1] // 2, :],
-                    levels=[0, 1],
+                    ref_plane,
+                    levels=levels,
                     linewidths=contour_linewidths,
-                    colors=contour_colors[1],
+                    colors=contour_colors[0],
                 )
-        elif i < 3*len(scan_digits):
-            X, Y = np.meshgrid(np.arange(0, shape[1]), (np.arange(0, shape[0])))
-            ax.contour(
-                X,
-                Y,
-                support_ref[..., shape[2] // 2],
-                levels=[0, 0.1],
-                linewidths=contour_linewidths,
-                colors=contour_colors[0],
-
             )
-            if i % len(scan_digits) != 0:
-                ax.contour(
-                    X,
-                    Y,
-                    supports[scan_digits[i%len(scan_digits)]][..., shape[2] // 2],
-                    levels=[0, 1],
-                    linewidths=contour_linewidths,
-                    colors=contour_colors[1],
+            if k:
+                rasterize_contour_set(
+                    ax.contour(
+                        support_planes[scan_digits[k]][j],
+                        levels=[0, 1],
+                        linewidths=contour_linewidths,
+                        colors=contour_colors[1],
+                    )
                 )
-        
+
     return filtered_amp_fig
 
 
 
+def set_contourf_edgecolor(
+        contour_set: matplotlib.contour.ContourSet,
+        color: str = "face"
+) -> None:
+    """
+    Set the edge colour of all the filled contours at once, rather than
+    looping over each of the level collections.
+    """
+    if isinstance(contour_set, matplotlib.collections.Collection):
+        # matplotlib >= 3.8, the ContourSet is a single Collection
+        contour_set.set_edgecolor(color)
+    else:
+        plt.setp(contour_set.collections, edgecolor=color)
+
+
+def rasterize_contour_set(
+        contour_set: matplotlib.contour.ContourSet
+) -> matplotlib.contour.ContourSet:
+    """
+    Rasterize a (filled) contour set. Before matplotlib 3.8, contour
+    and contourf ignore the rasterized kwarg, so the level collections
+    must be rasterized one by one.
+    """
+    if isinstance(contour_set, matplotlib.collections.Collection):
+        # matplotlib >= 3.8, the ContourSet is a single Collection
+        contour_set.set_rasterized(True)
+    else:
+        plt.setp(contour_set.collections, rasterized=True)
+    return contour_set
+
+
+def _plot_intensity_map(
+        ax: matplotlib.axes.Axes,
+        x: np.ndarray,
+        y: np.ndarray,
+        intensity: np.ndarray,
+        levels: int | list = None,
+        cmap: str | matplotlib.colors.Colormap = "turbo"
+) -> matplotlib.cm.ScalarMappable:
+    """
+    Draw a 2D intensity map either as a gouraud-shaded mesh (levels is
+    None) or as filled contours.
+    """
+    if levels is None:
+        return ax.pcolormesh(
+            x, y, intensity, shading="gouraud", cmap=cmap, rasterized=True
+        )
+    contour_set = ax.contourf(x, y, intensity, levels=levels, cmap=cmap)
+    rasterize_contour_set(contour_set)
+    set_contourf_edgecolor(contour_set)
+    return contour_set
+
+
 def plot_diffraction_patterns(
         intensities,
         gridders,
@@ -554,7 +719,7 @@ def plot_diffraction_patterns(
         figsize=(8, 8),
         aspect_ratio="equal",
         maplog_min=3,
-        levels=100,
+        levels=None,
         xlim=None,
         ylim=None,
         zlim=None,
@@ -562,6 +727,17 @@ def plot_diffraction_patterns(
         cmap="turbo",
         angstrom_symbol=r"\si{\angstrom}"
 ):
+    """
+    Plot the three projections of the log-scaled diffracted intensities
+    in the orthogonal q space.
+
+    :param levels: if None, the intensity is drawn as a smooth
+    gouraud-shaded mesh, which is much cheaper than filled contours.
+    Otherwise, the number of filled contour levels (int) or the list of
+    levels. The contour drawing cost scales with the number of levels,
+    for log-scaled intensity 32 levels are visually indistinguishable
+    from finer levels. Default: None.
+    """
     if len(intensities) != len(gridders):
         print("lists intensities and gridders must have the same length")
         return None
@@ -584,8 +760,17 @@ def plot_diffraction_patterns(
     )
 
     for i, (intensity, (qx, qy, qz)) in enumerate(zip(intensities, gridders)):
-        log_intensity = xu.maplog(intensity, maplog_min, 0)
-        
+        # float32 is enough for display, the projections and contourf
+        # then run on half the bytes
+        log_intensity = xu.maplog(
+            intensity, maplog_min, 0
+        ).astype(np.float32, copy=False)
+        projections = (
+            log_intensity.sum(axis=2).T,
+            log_intensity.sum(axis=1).T,
+            log_intensity.sum(axis=0).T
+        )
+
         if data_stacking == "vertical":
             ax_coord = (i, 0)
             increment = (0, 1)
@@ -593,13 +778,8 @@ def plot_diffraction_patterns(
             ax_coord = (0, i)
             increment = (1, 0)
 
-        summed_intensity = log_intensity.sum(axis=2).T
-        normalized_intensity = (
-            (summed_intensity - np.min(summed_intensity))
-            / np.ptp(summed_intensity)
-        )
-        cnt = axes[ax_coord].contourf(
-            qx, qy, summed_intensity, levels=levels, cmap=cmap
+        cnt = _plot_intensity_map(
+            axes[ax_coord], qx, qy, projections[0], levels, cmap
         )
         try:
             axes[ax_coord].set_xlabel(r"$Q_X (" + angstrom_symbol + r"^{-1})$")
@@ -607,8 +787,6 @@ def plot_diffraction_patterns(
             angstrom_symbol = r"\AA"
             axes[ax_coord].set_xlabel(r"$Q_X (" + angstrom_symbol + r"^{-1})$")
         axes[ax_coord].set_ylabel(r"$Q_Y (" + angstrom_symbol + r"^{-1})$")
-        for c in cnt.collections:
-            c.set_edgecolor("face")
         if xlim is not None:
             axes[ax_coord].set_xlim(xlim[0], xlim[1])
         if ylim is not None:
@@ -617,18 +795,11 @@ def plot_diffraction_patterns(
             axes[ax_coord].set_title(titles[i])
 
         ax_coord = tuple([sum(t) for t in zip(ax_coord, increment)])
-        summed_intensity = log_intensity.sum(axis=1).T
-        normalized_intensity = (
-            (summed_intensity - np.min(summed_intensity))
-            / np.ptp(summed_intensity)
-        )
-        cnt = axes[ax_coord].contourf(
-            qx, qz, summed_intensity, levels=levels, cmap=cmap
+        cnt = _plot_intensity_map(
+            axes[ax_coord], qx, qz, projections[1], levels, cmap
         )
         axes[ax_coord].set_xlabel(r"$Q_X (" + angstrom_symbol + r"^{-1})$")
         axes[ax_coord].set_ylabel(r"$Q_Z (" + angstrom_symbol + r"^{-1})$")
-        for c in cnt.collections:
-            c.set_edgecolor("face")
 
         if xlim is not None:
             axes[ax_coord].set_xlim(xlim[0], xlim[1])
@@ -638,18 +809,15 @@ def plot_diffraction_patterns(
             axes[ax_coord].set_title(titles[i])
 
         ax_coord = tuple([sum(t) for t in zip(ax_coord, increment)])
-        summed_intensity = log_intensity.sum(axis=0).T
         normalized_intensity = (
-            (summed_intensity - np.min(summed_intensity))
-            / np.ptp(summed_intensity)
+            (projections[2] - np.min(projections[2]))
+            / np.ptp(projections[2])
         )
-        cnt = axes[ax_coord].contourf(
-            qy, qz, normalized_intensity, levels=levels, cmap=cmap
+        cnt = _plot_intensity_map(
+            axes[ax_coord], qy, qz, normalized_intensity, levels, cmap
         )
         axes[ax_coord].set_xlabel(r"$Q_Y (" + angstrom_symbol + r"^{-1})$")
         axes[ax_coord].set_ylabel(r"$Q_Z (" + angstrom_symbol + r"^{-1})$")
-        for c in cnt.collections:
-            c.set_edgecolor("face")
         if ylim is not None:
             axes[ax_coord].set_xlim(ylim[0], ylim[1])
         if zlim is not None:
@@ -675,6 +843,10 @@ def plot_contour(
         pixel_size=None,
         data_centre=None
 ):
+    """
+    Plot the contour of a 2D support. The support must be binary (0 and
+    1 or boolean values), not np.nan-valued.
+    """
     shape = support_2d.shape
     x_range = np.arange(0, shape[1])
     y_range = np.arange(0, shape[0])
@@ -689,11 +861,13 @@ def plot_contour(
 
     with warnings.catch_warnings():
         warnings.simplefilter("ignore", category=UserWarning)
-        ax.contour(
-            X,
-            Y,
-            nan_to_zero(support_2d),
-            levels=[0, 1],
-            linewidths=linewidth,
-            colors=color,
+        rasterize_contour_set(
+            ax.contour(
+                X,
+                Y,
+                support_2d,
+                levels=[0, 1],
+                linewidths=linewidth,
+                colors=color,
+            )
         )
\ No newline at end of file
@@ -135,9 +135,9 @@ class FacetAnalysisProcessor:
         self.path_visu = f'{self.path_f}/visualization/'
         
         self.X, self.Y, self.Z = np.shape(self.support)
-        self.surface = (self.support 
-                        - erosion(self.support).astype(int)
-        )
+        self.surface = (self.support
+                        * ~erosion(self.support)
+        ).astype(np.result_type(self.support, int), copy=False)
 
 
     def check_previous_data(self) -> None:
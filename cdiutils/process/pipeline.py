@@ -1,16 +1,34 @@
-from typing import Callable, Dict
+from typing import Callable, Dict, Iterable, TextIO, TYPE_CHECKING
 from string import Template
+import atexit
+import copy
+import functools
 import glob
+import importlib
+import importlib.util
 import os
+import platform
+import re
 import shutil
 import subprocess
+import sys
+import threading
 import time
 import traceback
 
-import paramiko
 import ruamel.yaml
 import yaml
 
+# use the libyaml bindings when PyYAML was built against them
+try:
+    from yaml import (
+        CSafeLoader as SafeLoader,
+        CFullLoader as FullLoader,
+        CDumper as Dumper
+    )
+except ImportError:
+    from yaml import SafeLoader, FullLoader, Dumper
+
 from cdiutils.plot.formatting import update_plot_params
 from cdiutils.utils import pretty_print
 from .processor import BcdiProcessor
@@ -19,23 +37,110 @@ from .parameters import check_parameters, convert_np_arrays
 
 from cdiutils.process.facet_analysis import FacetAnalysisProcessor
 
-try:
-    from bcdi.preprocessing.preprocessing_runner import (
-        run as run_preprocessing
-    )
-    from bcdi.postprocessing.postprocessing_runner import (
-        run as run_postprocessing
-    )
-    from bcdi.utils.parser import ConfigParser
-    IS_BCDI_AVAILABLE = True
-except ModuleNotFoundError:
+# paramiko and bcdi are only imported when actually used, as they are
+# long to import and most users do not need them
+if TYPE_CHECKING:
+    import paramiko
+
+IS_BCDI_AVAILABLE = importlib.util.find_spec("bcdi") is not None
+if not IS_BCDI_AVAILABLE:
     print("The bcdi package is not installed. bcdi backend won't be available")
-    IS_BCDI_AVAILABLE = False  # is_bcdi_available
 
 BCDI_ERROR_TEXT = (
     "Cannot use 'bcdi' backend if bcdi package is not"
     "installed."
 )
+PARAMIKO_ERROR_TEXT = (
+    "The paramiko package is required to run the processes on a remote "
+    "machine, install it with 'pip install paramiko'."
+)
+
+
+def _import_paramiko():
+    """Import paramiko, only needed for the remote machine processes."""
+    try:
+        import paramiko
+    except ModuleNotFoundError as exc:
+        raise ModuleNotFoundError(PARAMIKO_ERROR_TEXT) from exc
+    return paramiko
+
+
+# buffer size of the pipes the subprocess outputs are streamed from
+_PIPE_BUFFER_SIZE = 1 << 16
+
+# the PyNX command to run on the machines where PyNX is installed,
+# given by their hostname prefix
+_LOCAL_PYNX_COMMANDS = {
+    "p9": "pynx-cdi-id01",
+    "scisoft16": "pynx-cdi-id01",
+}
+_LOCAL_PYNX_COMMAND = next(
+    (
+        command for prefix, command in _LOCAL_PYNX_COMMANDS.items()
+        if platform.node().lower().startswith(prefix)
+    ),
+    None
+)
+
+
+# parsed yaml files, keyed by path and loader, with the modification
+# stamp they were parsed at
+_YAML_CACHE = {}
+
+
+def _load_yaml_cached(file_path: str, loader: type) -> dict:
+    """
+    Load a yaml file, reusing the previous parsing result if the file
+    has not changed since (same modification time and size). A deep
+    copy is returned so callers can freely modify it.
+    """
+    stat = os.stat(file_path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    key = (os.path.abspath(file_path), loader)
+
+    cached = _YAML_CACHE.get(key)
+    if cached is None or cached[0] != stamp:
+        # the stream is given as bytes, libyaml then reads and decodes
+        # it itself
+        with open(file_path, "rb") as file:
+            cached = (stamp, yaml.load(file, Loader=loader))
+        _YAML_CACHE[key] = cached
+    return copy.deepcopy(cached[1])
+
+
+def _forget_yaml_cache(file_path: str) -> None:
+    """
+    Drop the cached parsing results of a file that is being written,
+    whatever the resolution of the file system timestamps.
+    """
+    abs_path = os.path.abspath(file_path)
+    for key in [key for key in _YAML_CACHE if key[0] == abs_path]:
+        del _YAML_CACHE[key]
+
+
+# round-trip yaml instance shared by all parameter file updates, and
+# the indentation guessed for each updated file, with the modification
+# time of the file it is valid for
+_RT_YAML = ruamel.yaml.YAML()
+_YAML_INDENTS = {}
+
+
+@functools.lru_cache(maxsize=8)
+def _read_template(file_path: str, mtime_ns: int) -> Template:
+    # mtime_ns is only part of the cache key, so that an edited
+    # template is read again
+    with open(file_path, "r", encoding="utf8") as file:
+        return Template(file.read())
+
+
+def _load_template(file_path: str) -> Template:
+    """
+    Load a string.Template from a file, reusing the one already read
+    if the file has not been modified since.
+    """
+    return _read_template(
+        os.path.abspath(file_path), os.stat(file_path).st_mtime_ns
+    )
 
 
 def make_scan_parameter_file(
@@ -48,11 +153,11 @@ def make_scan_parameter_file(
     to update.
     """
 
-    with open(parameter_file_template_path, "r", encoding="utf8") as file:
-        source = Template(file.read())
-
+    source = _load_template(parameter_file_template_path)
     scan_parameter_file = source.substitute(updated_parameters)
 
+    _forget_yaml_cache(output_parameter_file_path)
+    _YAML_INDENTS.pop(os.path.abspath(output_parameter_file_path), None)
     with open(output_parameter_file_path, "w", encoding="utf8") as file:
         file.write(scan_parameter_file)
 
@@ -63,36 +168,179 @@ def update_parameter_file(file_path: str, updated_parameters: dict) -> None:
     the parameters (keys, values) to uptade.
     """
     convert_np_arrays(updated_parameters)
+    abs_path = os.path.abspath(file_path)
+    mtime_ns, indents = _YAML_INDENTS.get(abs_path, (None, None))
     with open(file_path, "r", encoding="utf8") as file:
-        config, ind, bsi = ruamel.yaml.util.load_yaml_guess_indent(file)
-
-    for key in config.keys():
-        for updated_key, updated_value in updated_parameters.items():
-            if updated_key in config[key]:
-                config[key][updated_key] = updated_value
-            elif updated_key == key:
-                config[key] = updated_value
-            else:
-                for sub_key in config[key].keys():
-                    if (
-                            isinstance(config[key][sub_key], dict)
-                            and updated_key in config[key][sub_key]
-                    ):
-                        config[key][sub_key][updated_key] = updated_value
+        if indents is None or mtime_ns != os.stat(file_path).st_mtime_ns:
+            config, *indents = ruamel.yaml.util.load_yaml_guess_indent(
+                file
+            )
+        else:
+            # the file was last written below, with this indentation
+            config = _RT_YAML.load(file)
+
+    # index, in one pass, the containers where each key must be updated.
+    # Within a section, a key of the section itself takes precedence
+    # over the section name, which takes precedence over the keys of
+    # its sub-sections.
+    index = {}
+    for key, section in config.items():
+        targets = {}
+        for sub_key, sub_section in section.items():
+            if isinstance(sub_section, dict):
+                for leaf_key in sub_section:
+                    targets.setdefault(leaf_key, []).append(
+                        (sub_section, leaf_key)
+                    )
+        targets[key] = [(config, key)]
+        targets.update(
+            {leaf_key: [(section, leaf_key)] for leaf_key in section}
+        )
+        for leaf_key, leaf_targets in targets.items():
+            index.setdefault(leaf_key, []).extend(leaf_targets)
+
+    for updated_key, updated_value in updated_parameters.items():
+        for node, node_key in index.get(updated_key, []):
+            node[node_key] = updated_value
 
-    yaml_file = ruamel.yaml.YAML()
-    yaml_file.indent(mapping=ind, sequence=ind, offset=bsi)
+    ind, bsi = indents
+    _RT_YAML.indent(mapping=ind, sequence=ind, offset=bsi)
+    _forget_yaml_cache(file_path)
     with open(file_path, "w", encoding="utf8") as file:
-        yaml_file.dump(config, file)
+        _RT_YAML.dump(config, file)
+    _YAML_INDENTS[abs_path] = (os.stat(file_path).st_mtime_ns, indents)
+
 
+@functools.lru_cache(maxsize=4)
+def _read_private_key(
+        file_path: str,
+        mtime_ns: int
+) -> "paramiko.RSAKey":
+    # mtime_ns is only part of the cache key, so that a replaced key
+    # is read again
+    paramiko = _import_paramiko()
+    return paramiko.RSAKey.from_private_key_file(file_path)
+
+
+def _load_private_key(file_path: str) -> "paramiko.RSAKey":
+    """
+    Load the RSA private key used for the ssh connections, reusing the
+    one already read if the key file has not changed since.
+    """
+    return _read_private_key(
+        os.path.abspath(file_path), os.stat(file_path).st_mtime_ns
+    )
+
+
+# open ssh connections, keyed by (machine, user, key file path), so that
+# they are reused across the pipeline calls
+_SSH_CLIENTS = {}
+
+
+def _get_ssh_client(
+        machine: str,
+        user: str,
+        key_file_path: str
+) -> "paramiko.SSHClient":
+    """
+    Get a connected ssh client to the machine, reusing the one opened
+    by a previous call if its connection is still active.
+    """
+    key = (machine, user, os.path.abspath(key_file_path))
+    client = _SSH_CLIENTS.get(key)
+    if client is not None:
+        transport = client.get_transport()
+        if transport is not None and transport.is_active():
+            return client
+        client.close()
+
+    paramiko = _import_paramiko()
+    client = paramiko.SSHClient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    client.connect(
+        hostname=machine,
+        username=user,
+        pkey=_load_private_key(key_file_path)
+    )
+    # keep the pooled connection alive during long remote runs
+    client.get_transport().set_keepalive(30)
+    _SSH_CLIENTS[key] = client
+    return client
+
+
+@atexit.register
+def _close_ssh_clients() -> None:
+    for client in _SSH_CLIENTS.values():
+        client.close()
+    _SSH_CLIENTS.clear()
+
+
+def _echo_lines(lines: Iterable[str], log_file: TextIO = None) -> None:
+    """
+    Write the lines of a process output to stdout as they come, and to
+    the log file if provided.
+    """
+    write = sys.stdout.write
+    for line in lines:
+        write(line)
+        if log_file is not None:
+            log_file.write(line)
+    sys.stdout.flush()
+
+
+def _make_ssh_runner(client: "paramiko.SSHClient") -> Callable[[str], str]:
+    """
+    Make a function that runs a shell command through the provided
+    connected ssh client and returns its stdout.
+    """
+    def run(command: str) -> str:
+        _, stdout, _ = client.exec_command(command)
+        return stdout.read().decode("utf-8")
+    return run
+
+
+# the slurm job states after which the job may still complete
+_SLURM_ACTIVE_STATES = (
+    "PENDING", "RUNNING", "COMPLETING", "CONFIGURING", "REQUEUED"
+)
+
+
+def _slurm_state(job_id: str, runner: Callable[[str], str]) -> str:
+    """
+    Get the state of a slurm job, using the runner (see
+    _make_ssh_runner) to execute the sacct command.
+    """
+    output = runner(
+        f"sacct -j {job_id} --format=State --noheader -P"
+    )
+
+    # the first line is the state of the job itself, the next ones are
+    # the states of its steps. The job might not be accounted yet.
+    lines = output.strip().splitlines()
+    return lines[0].strip() if lines else "PENDING"
+
+
+@functools.lru_cache(maxsize=1)
+def _get_bcdi_pipeline_parser() -> type:
+    """
+    Define the BcdiPipelineParser class on first use, since it derives
+    from the bcdi ConfigParser.
+    """
+    if not IS_BCDI_AVAILABLE:
+        raise ModuleNotFoundError(BCDI_ERROR_TEXT)
+    from bcdi.utils.parser import ConfigParser
 
-if IS_BCDI_AVAILABLE:
     class BcdiPipelineParser(ConfigParser):
         def __init__(self, file_path: str) -> None:
             super().__init__(file_path)
 
+        def _load_raw_args(self) -> Dict:
+            # parsed once for both load_arguments and
+            # load_bcdi_parameters
+            return _load_yaml_cached(self.file_path, SafeLoader)
+
         def load_arguments(self) -> Dict:
-            raw_args = yaml.load(self.raw_config, Loader=yaml.SafeLoader)
+            raw_args = self._load_raw_args()
 
             raw_args["preprocessing"].update(raw_args["general"])
             raw_args["postprocessing"].update(raw_args["general"])
@@ -116,13 +364,18 @@ if IS_BCDI_AVAILABLE:
                 self,
                 procedure: str = "preprocessing"
         ) -> Dict:
-            raw_args = yaml.load(
-                self.raw_config,
-                Loader=yaml.SafeLoader
-            )[procedure]
+            raw_args = self._load_raw_args()[procedure]
             raw_args.update(raw_args["general"])
             return self._check_args(raw_args)
 
+    return BcdiPipelineParser
+
+
+def __getattr__(name: str):
+    if name == "BcdiPipelineParser" and IS_BCDI_AVAILABLE:
+        return _get_bcdi_pipeline_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def process(func: Callable) -> Callable:
     def wrapper(*args, **kwargs):
@@ -147,6 +400,10 @@ class BcdiPipeline:
     :param parameter_file_path: the path (str) of the scan parameter
     file that holds all the information related to the entire process.
     """
+
+    # bcdi runner functions, imported on first use
+    _bcdi_runners: dict[str, Callable] = {}
+
     def __init__(
             self,
             parameter_file_path: str = None,
@@ -194,7 +451,21 @@ class BcdiPipeline:
         self.bcdi_processor: BcdiProcessor = None
         self.result_analyser: PhasingResultAnalyser = None
 
-        # update the plot parameters
+        # the plot parameters are only updated when a figure is about
+        # to be made, see _ensure_plot_params_set
+        self._plot_params_ready = False
+
+        # (path, parameters hash, file modification time) of the last
+        # parameter file dumped by save_parameter_file
+        self._saved_params: tuple = None
+
+    def _ensure_plot_params_set(self) -> None:
+        """
+        Update the matplotlib plot parameters, once, before the first
+        method that makes figures.
+        """
+        if self._plot_params_ready:
+            return
         update_plot_params(
             usetex=self.params["cdiutils"]["usetex"],
             use_siunitx=self.params["cdiutils"]["usetex"],
@@ -205,6 +476,22 @@ class BcdiPipeline:
                 "figure.titlesize": 8,
             }
         )
+        self._plot_params_ready = True
+
+    @classmethod
+    def _get_bcdi_runner(cls, procedure: str) -> Callable:
+        """
+        Get the run function of the bcdi preprocessing or
+        postprocessing runner. bcdi is only imported on the first
+        request and the function is then kept on the class.
+        """
+        if not IS_BCDI_AVAILABLE:
+            raise ModuleNotFoundError(BCDI_ERROR_TEXT)
+        if procedure not in cls._bcdi_runners:
+            cls._bcdi_runners[procedure] = importlib.import_module(
+                f"bcdi.{procedure}.{procedure}_runner"
+            ).run
+        return cls._bcdi_runners[procedure]
 
     def load_parameters(
             self,
@@ -220,16 +507,14 @@ class BcdiPipeline:
             file_path = self.parameter_file_path
 
         if backend == "bcdi":
-            return BcdiPipelineParser(
+            return _get_bcdi_pipeline_parser()(
                 file_path
             ).load_arguments()
 
         if backend == "cdiutils":
-            with open(file_path, "r", encoding="utf8") as file:
-                parameters = yaml.load(
-                    file,
-                    Loader=yaml.FullLoader
-                )
+            # files written by save_parameter_file may hold python
+            # tags (e.g. tuples), hence no SafeLoader
+            parameters = _load_yaml_cached(file_path, FullLoader)
             check_parameters(parameters)
             return parameters
 
@@ -240,6 +525,7 @@ class BcdiPipeline:
 
     @process
     def preprocess(self, backend: str = None) -> None:
+        self._ensure_plot_params_set()
 
         if backend is None:
             backend = self.backend
@@ -255,7 +541,9 @@ class BcdiPipeline:
                 "[INFO] Proceeding to bcdi preprocessing using the bcdi "
                 f"backend ({self.sample_name}, S{self.scan})"
             )
-            run_preprocessing(prm=self.params["preprocessing"])
+            self._get_bcdi_runner("preprocessing")(
+                prm=self.params["preprocessing"]
+            )
             pynx_input_template = "S*_pynx_norm_*.npz"
             pynx_mask_template = "S*_maskpynx_norm_*.npz"
             self.save_parameter_file()
@@ -347,10 +635,14 @@ class BcdiPipeline:
 
         if clear_former_results:
             print("[INFO] Removing former results.\n")
-            files = glob.glob(self.pynx_phasing_dir + "/*Run*.cxi")
-            files += glob.glob(self.pynx_phasing_dir + "/*Run*.png")
-            for f in files:
-                os.remove(f)
+            # a single pass over the directory entries
+            with os.scandir(self.pynx_phasing_dir) as entries:
+                for entry in entries:
+                    if (
+                            "Run" in entry.name
+                            and entry.name.endswith((".cxi", ".png"))
+                    ):
+                        os.remove(entry.path)
             self.phasing_results = []
 
         pynx_input_file_path = (
@@ -359,110 +651,43 @@ class BcdiPipeline:
 
         # Make the pynx input file
         with open(pynx_input_file_path, "w", encoding="utf8") as file:
-            for key, value in self.params["pynx"].items():
-                file.write(f"{key} = {value}\n")
+            file.write(
+                "".join(
+                    f"{key} = {value}\n"
+                    for key, value in self.params["pynx"].items()
+                )
+            )
 
         if machine is None:
             print(
                 "[INFO] No machine provided, assuming PyNX is installed on "
                 "the current machine.\n"
             )
-            if os.uname()[1].lower().startswith(("p9", "scisoft16")):
-                # import threading
-                # import signal
-                # import sys
-
-                # def signal_handler(sig, frame):
-                #     print(
-                #         "Keyboard interrupt received, exiting main program...")
-                #     sys.exit(0)
-
-                # # Function to read and print subprocess output
-                # def read_output(pipe):
-                #     try:
-                #         for line in iter(pipe.readline, ""):
-                #             print(line.decode("utf-8"), end="")
-                #     except KeyboardInterrupt:
-                #         pass  # Catch KeyboardInterrupt to exit the thread
-
-                # # Register signal handler for keyboard interrupt
-                # signal.signal(signal.SIGINT, signal_handler)
-                # process = subprocess.Popen(
-                #         # "source /sware/exp/pynx/activate_pynx.sh;"
-                #         f"cd {self.pynx_phasing_dir};"
-                #         # "mpiexec -n 4 /sware/exp/pynx/devel.p9/bin/"
-                #         "pynx-cdi-id01 pynx-cdi-inputs.txt",
-                #         shell=True,
-                #         executable="/bin/bash",
-                #         stdout=subprocess.PIPE,
-                #         stderr=subprocess.PIPE,
-                # )
+            if _LOCAL_PYNX_COMMAND is not None:
+                # stream the PyNX output as it comes instead of buffering
+                # it until the end of the run
                 with subprocess.Popen(
                         # "source /sware/exp/pynx/activate_pynx.sh;"
                         f"cd {self.pynx_phasing_dir};"
                         # "mpiexec -n 4 /sware/exp/pynx/devel.p9/bin/"
-                        "pynx-cdi-id01 pynx-cdi-inputs.txt",
+                        f"{_LOCAL_PYNX_COMMAND} pynx-cdi-inputs.txt",
                         shell=True,
                         executable="/bin/bash",
                         stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
+                        stderr=subprocess.STDOUT,
+                        bufsize=_PIPE_BUFFER_SIZE,
+                        text=True,
                 ) as proc:
-                    stdout, stderr = proc.communicate()
-                    print(
-                        "[STDOUT FROM SUBPROCESS RUNNING PYNX]\n",
-                        stdout.decode("utf-8")
+                    print("[STDOUT FROM SUBPROCESS RUNNING PYNX]")
+                    _echo_lines(proc.stdout)
+                if proc.returncode:
+                    raise RuntimeError(
+                        "[ERROR] PyNX phase retrieval failed (exit status "
+                        f"{proc.returncode}), see the output above."
                     )
-                    if proc.returncode:
-                        print(
-                            "[STDERR FROM SUBPROCESS RUNNING PYNX]\n",
-                            stderr.decode("utf-8")
-                        )
-
-                # # Start threads to read stdout and stderr
-                # stdout_thread = threading.Thread(
-                #     target=read_output, args=(process.stdout,)
-                # )
-                # stderr_thread = threading.Thread(
-                #     target=read_output, args=(process.stderr,)
-                # )
-
-                # stdout_thread.start()
-                # stderr_thread.start()
-
-                # try:
-                #     # Wait for the subprocess to complete
-                #     process.wait()
-                # except KeyboardInterrupt:
-                #     print(
-                #         "Keyboard interrupt received, terminating "
-                #         "subprocess..."
-                #     )
-                #     process.terminate()  # Send SIGTERM to the subprocess
-                #     process.wait()  # Wait for the subprocess to terminate
-                    
-                #     # Terminate the threads
-                #     stdout_thread.join(timeout=1)  # Wait for stdout_thread to terminate
-                #     if stdout_thread.is_alive():
-                #         print("Forcefully terminating stdout_thread...")
-                #         stdout_thread.cancel()
-                    
-                #     stderr_thread.join(timeout=1)  # Wait for stderr_thread to terminate
-                #     if stderr_thread.is_alive():
-                #         print("Forcefully terminating stderr_thread...")
-                #         stderr_thread.cancel()
-
-                # # Wait for the threads to complete
-                # stdout_thread.join()
-                # stderr_thread.join()
         else:
             # ssh to the machine and run phase retrieval
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            client.connect(
-                hostname=machine,
-                username=user,
-                pkey=paramiko.RSAKey.from_private_key_file(key_file_path)
-            )
+            client = _get_ssh_client(machine, user, key_file_path)
 
             print(f"[INFO] Connected to {machine}")
             if machine == "slurm-nice-devel":
@@ -474,21 +699,19 @@ class BcdiPipeline:
                         "pynx-id01cdi_template.slurm"
                     )
                     print(
-                        "Pynx slurm file template not provided, will take "
-                        f"the default: {pynx_slurm_file_template}")
-
-                with open(
-                        pynx_slurm_file_template, "r", encoding="utf8"
-                ) as file:
-                    source = Template(file.read())
-                    pynx_slurm_text = source.substitute(
-                        {
-                            "number_of_nodes": number_of_nodes,
-                            "data_path": self.pynx_phasing_dir,
-                            "SLURM_JOBID": "$SLURM_JOBID",
-                            "SLURM_NTASKS": "$SLURM_NTASKS"
-                        }
+                        "Pynx slurm file template not provided, will "
+                        f"take the default: {pynx_slurm_file_template}"
                     )
+
+                source = _load_template(pynx_slurm_file_template)
+                pynx_slurm_text = source.substitute(
+                    {
+                        "number_of_nodes": number_of_nodes,
+                        "data_path": self.pynx_phasing_dir,
+                        "SLURM_JOBID": "$SLURM_JOBID",
+                        "SLURM_NTASKS": "$SLURM_NTASKS"
+                    }
+                )
                 with open(
                         self.pynx_phasing_dir + "/pynx-id01cdi.slurm",
                         "w",
@@ -496,67 +719,7 @@ class BcdiPipeline:
                 ) as file:
                     file.write(pynx_slurm_text)
 
-                # submit job using sbatch slurm command
-                _, stdout, _ = client.exec_command(
-                    f"cd {self.pynx_phasing_dir};"
-                    "sbatch pynx-id01cdi.slurm"
-                )
-                job_submitted = False
-                time.sleep(0.5)
-
-                # read the standard output, decode it and print it
-                output = stdout.read().decode("utf-8")
-
-                # get the job id and remove '\n' and space characters
-                while not job_submitted:
-                    try:
-                        job_id = output.split(" ")[3].strip()
-                        job_submitted = True
-                        print(output)
-                    except IndexError:
-                        print("Job still not submitted...")
-                        time.sleep(3)
-                        print(output)
-                    except KeyboardInterrupt as err:
-                        print("User terminated job with KeyboardInterrupt.")
-                        client.close()
-                        raise err
-
-                # while loop to check if job has terminated
-                process_status = "PENDING"
-                while process_status != "COMPLETED":
-                    _, stdout, _ = client.exec_command(
-                        f"sacct -j {job_id} -o state | head -n 3 | tail -n 1"
-                    )
-
-                    # python process needs to sleep here, otherwise it gets in
-                    # trouble with standard output management. Anyway, we need
-                    # to sleep in the while loop in order to wait for the
-                    # remote  process to terminate.
-                    time.sleep(2)
-                    process_status = stdout.read().decode("utf-8").strip()
-                    print(f"[INFO] process status: {process_status}")
-
-                    if process_status == "RUNNING":
-                        _, stdout, _ = client.exec_command(
-                            f"cd {self.pynx_phasing_dir};"
-                            f"cat pynx-id01cdi.slurm-{job_id}.out "
-                            "| grep 'CDI Run:'"
-                        )
-                        time.sleep(1)
-                        print(stdout.read().decode("utf-8"))
-
-                    elif process_status == "CANCELLED+":
-                        raise RuntimeError("[INFO] Job has been cancelled")
-                    elif process_status == "FAILED":
-                        raise RuntimeError(
-                            "[ERROR] Job has failed. Check out logs at: \n",
-                            f"{self.pynx_phasing_dir}/"
-                            f"pynx-id01cdi.slurm-{job_id}.out"
-                        )
-
-                if process_status == "COMPLETED":
-                    print(f"[INFO] Job {job_id} is completed.")
+                self._submit_and_wait(_make_ssh_runner(client))
 
             else:
                 _, stdout, stderr = client.exec_command(
@@ -567,11 +730,73 @@ class BcdiPipeline:
                 )
                 if stdout.channel.recv_exit_status():
                     raise RuntimeError(
-                        f"Error pulling the remote runtime {stderr.readline()}"
+                        "Error pulling the remote runtime "
+                        f"{stderr.readline()}"
                     )
-                for line in iter(lambda: stdout.readline(1024), ""):
-                    print(line, end="")
-            client.close()
+                _echo_lines(iter(lambda: stdout.readline(1024), ""))
+
+    def _submit_and_wait(self, runner: Callable[[str], str]) -> None:
+        """
+        Submit the PyNX slurm job of the phasing directory and wait for
+        its completion, printing the progress of the runs.
+
+        Args:
+            runner (Callable[[str], str]): the function that executes a
+                shell command on the slurm machine and returns its
+                stdout (see _make_ssh_runner).
+
+        Raises:
+            RuntimeError: if the job could not be submitted, has been
+                cancelled or has failed.
+        """
+        # submit job using sbatch slurm command, the runner returns
+        # once sbatch has
+        output = runner(
+            f"cd {self.pynx_phasing_dir};"
+            "sbatch pynx-id01cdi.slurm 2>&1"
+        )
+        print(output)
+
+        # get the job id
+        match = re.search(r"Submitted batch job (\d+)", output)
+        if match is None:
+            raise RuntimeError(
+                f"[ERROR] sbatch did not return a job id:\n{output}"
+            )
+        job_id = match.group(1)
+        log_file_path = (
+            f"{self.pynx_phasing_dir}/pynx-id01cdi.slurm-{job_id}.out"
+        )
+
+        # while loop to check if job has terminated, polling less and
+        # less often as the job lasts
+        process_status = "PENDING"
+        delay = 1.
+        while process_status != "COMPLETED":
+            time.sleep(delay)
+            delay = min(delay * 1.5, 30.)
+            process_status = _slurm_state(job_id, runner)
+            print(f"[INFO] process status: {process_status}")
+
+            if process_status == "RUNNING":
+                print(runner(f"grep 'CDI Run:' {log_file_path}"))
+            elif process_status.startswith("CANCELLED"):
+                raise RuntimeError(
+                    "[INFO] Job has been cancelled. Check out logs at:\n"
+                    f"{log_file_path}"
+                )
+            elif (
+                    process_status != "COMPLETED"
+                    and process_status not in _SLURM_ACTIVE_STATES
+            ):
+                # any other state (FAILED, TIMEOUT, OUT_OF_MEMORY,
+                # NODE_FAIL...) means the job is over
+                raise RuntimeError(
+                    f"[ERROR] Job has ended with state {process_status}. "
+                    f"Check out logs at:\n{log_file_path}"
+                )
+
+        print(f"[INFO] Job {job_id} is completed.")
 
     def analyze_phasing_results(self, *args, **kwargs) -> None:
         """
@@ -626,6 +851,7 @@ class BcdiPipeline:
         Raises:
             ValueError: if sorting_criterion is unknown.
         """
+        self._ensure_plot_params_set()
         if self.result_analyser is None or init_analyser:
             self.result_analyser = PhasingResultAnalyser(
                 result_dir_path=self.pynx_phasing_dir
@@ -673,7 +899,8 @@ class BcdiPipeline:
             run_command: str = None,
             machine: str = None,
             user: str = None,
-            key_file_path: str = None
+            key_file_path: str = None,
+            use_ssh_multiplexing: bool = False
     ) -> None:
         """
         Run the mode decomposition using PyNX pynx-cdi-analysis.py
@@ -688,15 +915,23 @@ class BcdiPipeline:
                 to None.
             key_file_path (str, optional): Path to the key file for SSH
                 authentication. Defaults to None.
+            use_ssh_multiplexing (bool, optional): whether to run the
+                remote command through the OpenSSH client with
+                connection multiplexing (ControlMaster) instead of
+                paramiko. The master connection persists for 10 min
+                after the call, so that the next calls skip the ssh
+                handshake. Its control socket is created in ~/.ssh,
+                which must not be writable by other users, otherwise
+                they could run commands through the connection.
+                Defaults to False.
         """
-        if run_command is None:
-            run_command = (
-                f"cd {self.pynx_phasing_dir};"
-                f"{pynx_analysis_script} candidate_*.cxi --modes 1 "
-                "--modes_output mode.h5 2>&1 | tee mode_decomposition.log"
-            )
-
         if machine:
+            if run_command is None:
+                run_command = (
+                    f"cd {self.pynx_phasing_dir};"
+                    f"{pynx_analysis_script} candidate_*.cxi --modes 1 "
+                    "--modes_output mode.h5 2>&1 | tee mode_decomposition.log"
+                )
             print(f"[INFO] Remote connection to machine '{machine}'requested.")
             if user is None:
                 user = os.environ["USER"]
@@ -711,44 +946,94 @@ class BcdiPipeline:
                 f"[INFO] Running mode decomposition on machine '{machine}'"
                 f"({self.sample_name}, S{self.scan})"
             )
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            client.connect(
-                hostname=machine,
-                username=user,
-                pkey=paramiko.RSAKey.from_private_key_file(key_file_path)
-            )
+            if use_ssh_multiplexing:
+                self._run_with_ssh_multiplexing(
+                    run_command, machine, user, key_file_path
+                )
+                return
 
+            client = _get_ssh_client(machine, user, key_file_path)
             _, stdout, stderr = client.exec_command(run_command)
-            # read the standard output, decode it and print it
-            formatted_stdout = stdout.read().decode("utf-8")
-            formatted_stderr = stderr.read().decode("utf-8")
+
+            # drain stderr in the background while stdout is streamed,
+            # otherwise a full stderr channel window would block the
+            # remote process and hence the reading of stdout
+            stderr_lines = []
+            stderr_thread = threading.Thread(
+                target=lambda: stderr_lines.extend(stderr),
+                daemon=True
+            )
+            stderr_thread.start()
+
             print("[STDOUT FROM SSH PROCESS]\n")
-            print(formatted_stdout)
+            _echo_lines(stdout)
+            stderr_thread.join()
             print("[STDERR FROM SSH PROCESS]\n")
-            print(formatted_stderr)
+            print("".join(stderr_lines))
 
             if stdout.channel.recv_exit_status():
                 raise RuntimeError(
-                    f"Error pulling the remote runtime {stderr.readline()}")
-            client.close()
+                    "Error pulling the remote runtime "
+                    f"{stderr_lines[0] if stderr_lines else ''}"
+                )
 
         # if no machine provided, run the mode decomposition as a subprocess
         else:
+            if run_command is None:
+                # no shell needed, the candidate files are listed here
+                # and the log file is written while streaming
+                # paths relative to the phasing directory, the process
+                # runs from there
+                candidates = sorted(
+                    glob.glob(
+                        "candidate_*.cxi", root_dir=self.pynx_phasing_dir
+                    )
+                )
+                if not candidates:
+                    raise FileNotFoundError(
+                        "[ERROR] No candidate_*.cxi file found in "
+                        f"{self.pynx_phasing_dir}, run "
+                        "select_best_candidates first."
+                    )
+                command = [
+                    pynx_analysis_script,
+                    *candidates,
+                    "--modes", "1",
+                    "--modes_output", "mode.h5"
+                ]
+                cwd = self.pynx_phasing_dir
+                log_file_path = (
+                    f"{self.pynx_phasing_dir}/mode_decomposition.log"
+                )
+            else:
+                command = run_command
+                cwd = None
+                log_file_path = None
+
+            # stream the output as it comes
             with subprocess.Popen(
-                    run_command,
-                    shell=True,
-                    executable="/usr/bin/bash",
+                    command,
+                    shell=run_command is not None,
+                    executable=(
+                        None if run_command is None else "/usr/bin/bash"
+                    ),
+                    cwd=cwd,
                     stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    bufsize=_PIPE_BUFFER_SIZE,
+                    text=True,
             ) as proc:
-                stdout, stderr = proc.communicate()
-                print("[STDOUT FROM SUBPROCESS]\n", stdout.decode("utf-8"))
-                if proc.returncode:
-                    print(
-                        "[STDERR FROM SUBPROCESS]\n",
-                        stderr.decode("utf-8")
-                    )
+                print("[OUTPUT FROM SUBPROCESS]\n")
+                if log_file_path is None:
+                    _echo_lines(proc.stdout)
+                else:
+                    with open(log_file_path, "w", encoding="utf8") as log:
+                        _echo_lines(proc.stdout, log)
+            if proc.returncode:
+                print(
+                    "[ERROR] Mode decomposition subprocess exited with "
+                    f"status {proc.returncode}, see the output above."
+                )
 
             if self.parameter_file_path is not None:
                 if self.backend == "bcdi":
@@ -765,8 +1050,42 @@ class BcdiPipeline:
                     )
                 self.params = self.load_parameters()
 
+    @staticmethod
+    def _run_with_ssh_multiplexing(
+            command: str,
+            machine: str,
+            user: str,
+            key_file_path: str
+    ) -> None:
+        """
+        Run a command on a remote machine with the OpenSSH client,
+        sharing a single master connection between the calls.
+        """
+        with subprocess.Popen(
+                [
+                    "ssh",
+                    "-o", "ControlMaster=auto",
+                    "-o", "ControlPath=~/.ssh/cdiutils-%r@%h:%p",
+                    "-o", "ControlPersist=600",
+                    "-i", key_file_path,
+                    f"{user}@{machine}",
+                    command
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=_PIPE_BUFFER_SIZE,
+                text=True,
+        ) as proc:
+            print("[OUTPUT FROM SSH PROCESS]\n")
+            _echo_lines(proc.stdout)
+        if proc.returncode:
+            raise RuntimeError(
+                f"Remote command failed with exit status {proc.returncode}"
+            )
+
     @process
     def postprocess(self, backend: str = None) -> None:
+        self._ensure_plot_params_set()
 
         if backend is None:
             backend = self.backend
@@ -779,7 +1098,9 @@ class BcdiPipeline:
                 f"({self.sample_name}, S{self.scan})"
             )
 
-            run_postprocessing(prm=self.params["postprocessing"])
+            self._get_bcdi_runner("postprocessing")(
+                prm=self.params["postprocessing"]
+            )
             self.save_parameter_file()
 
         elif backend == "cdiutils":
@@ -850,21 +1171,49 @@ class BcdiPipeline:
         )
 
         if self.parameter_file_path is not None:
-            try:
-                shutil.copy(
-                    self.parameter_file_path,
-                    output_file_path
-                )
-            except shutil.SameFileError:
+            if (
+                    os.path.exists(output_file_path)
+                    and os.path.samefile(
+                        self.parameter_file_path, output_file_path
+                    )
+            ):
                 print(
                     "\nScan parameter file saved at:\n"
                     f"{output_file_path}"
                 )
+            else:
+                _forget_yaml_cache(output_file_path)
+                shutil.copy(
+                    self.parameter_file_path,
+                    output_file_path
+                )
 
         else:
             convert_np_arrays(self.params)
+
+            # skip the dump if these parameters were already saved in
+            # this file and the file has not been modified since
+            params_hash = hash(repr(self.params))
+            if (
+                    self._saved_params is not None
+                    and os.path.isfile(output_file_path)
+                    and self._saved_params == (
+                        output_file_path,
+                        params_hash,
+                        os.stat(output_file_path).st_mtime_ns
+                    )
+            ):
+                return
+
+            _forget_yaml_cache(output_file_path)
             with open(output_file_path, "w", encoding="utf8") as file:
-                yaml.dump(self.params, file)
+                # not a safe dumper, parameters may hold tuples
+                yaml.dump(self.params, file, Dumper=Dumper)
+            self._saved_params = (
+                output_file_path,
+                params_hash,
+                os.stat(output_file_path).st_mtime_ns
+            )
 
             print(
                 "\nScan parameter file saved at:\n"
@@ -872,6 +1221,7 @@ class BcdiPipeline:
             )
 
     def facet_analysis(self) -> None:
+        self._ensure_plot_params_set()
         facet_anlysis_processor = FacetAnalysisProcessor(
             parameters=self.params
         )
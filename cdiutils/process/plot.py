@@ -6,7 +6,7 @@ import numpy as np
 # import silx.io
 # import h5py
 
-from cdiutils.utils import zero_to_nan
+from cdiutils.utils import zero_to_nan, get_masked_centred_slices
 from cdiutils.plot.formatting import (
     set_plot_configs,
     white_interior_ticks_labels,
@@ -366,6 +366,30 @@ def preprocessing_detector_data_plot(
     return figure
 
 
+def _min_max_vmin_vmax(data: np.ndarray) -> tuple[float, float]:
+    return np.nanmin(data), np.nanmax(data)
+
+
+def _zero_max_vmin_vmax(data: np.ndarray) -> tuple[float, float]:
+    return 0, np.nanmax(data)
+
+
+def _symmetric_vmin_vmax(data: np.ndarray) -> tuple[float, float]:
+    # the max of |data| is one of its extrema, no need to allocate
+    # np.abs(data)
+    vmax = max(-np.nanmin(data), np.nanmax(data))
+    return -vmax, vmax
+
+
+# how the colour limits are computed for each quantity, the others are
+# plotted with limits symmetric around zero.
+_VMIN_VMAX_FUNCTIONS = {
+    "dspacing": _min_max_vmin_vmax,
+    "lattice_parameter": _min_max_vmin_vmax,
+    "amplitude": _zero_max_vmin_vmax,
+}
+
+
 def summary_slice_plot(
         support: np.ndarray,
         save: str = None,
@@ -436,24 +460,25 @@ def summary_slice_plot(
 
     mappables = {}
     support = zero_to_nan(support)
+    # the support is only applied to the plotted planes, the colour
+    # limits are computed from the voxels within the support. The
+    # boolean support is also the one used for contouring.
+    in_support = ~np.isnan(support)
     for i, (key, array) in enumerate(kwargs.items()):
+        values = array
+        plane_support = None
         if support is not None and key != "amplitude":
-            array = support * array
+            values = array[in_support]
+            plane_support = support
 
         if key in PLOT_CONFIGS.keys():
             cmap = PLOT_CONFIGS[key]["cmap"]
             # check if vmin and vmax are given | not
             if single_vmin is None or single_vmax is None:
                 if support is not None:
-                    if key in ("dspacing", "lattice_parameter"):
-                        vmin = np.nanmin(array)
-                        vmax = np.nanmax(array)
-                    elif key == "amplitude":
-                        vmin = 0
-                        vmax = np.nanmax(array)
-                    else:
-                        vmax = np.nanmax(np.abs(array))
-                        vmin = -vmax
+                    vmin, vmax = _VMIN_VMAX_FUNCTIONS.get(
+                        key, _symmetric_vmin_vmax
+                    )(values)
                 else:
                     vmin = PLOT_CONFIGS[key]["vmin"]
                     vmax = PLOT_CONFIGS[key]["vmax"]
@@ -466,29 +491,40 @@ def summary_slice_plot(
             cmap = cmap if cmap else "turbo"
 
         shape = array.shape
-
-        axes[0, i].matshow(
-            array[shape[0] // 2],
+        # float32 is enough for display
+        planes = [
+            np.ascontiguousarray(p, dtype=np.float32)
+            for p in get_masked_centred_slices(array, plane_support)
+        ]
+
+        axes[0, i].imshow(
+            planes[0],
+            interpolation="nearest",
             vmin=vmin,
             vmax=vmax,
             cmap=cmap,
             origin="lower",
+            rasterized=True,
             # extent=extents[2] + extents[1]
         )
-        axes[1, i].matshow(
-            array[:, shape[1] // 2, :],
+        axes[1, i].imshow(
+            planes[1],
+            interpolation="nearest",
             vmin=vmin,
             vmax=vmax,
             cmap=cmap,
             origin="lower",
+            rasterized=True,
             # extent=extents[2] + extents[0]
         )
-        mappables[key] = axes[2, i].matshow(
-            np.swapaxes(array[..., shape[2] // 2], axis1=0, axis2=1),
+        mappables[key] = axes[2, i].imshow(
+            np.swapaxes(planes[2], axis1=0, axis2=1),
+            interpolation="nearest",
             vmin=vmin,
             vmax=vmax,
             cmap=cmap,
             origin="lower",
+            rasterized=True,
             # extent=extents[0] + extents[1]
         )
         for ax, plane in zip(
@@ -500,21 +536,21 @@ def summary_slice_plot(
         if key == "amplitude":
             plot_contour(
                 axes[0, i],
-                support[shape[0] // 2],
+                in_support[shape[0] // 2],
                 color="k",
                 pixel_size=(voxel_size[1], voxel_size[2]),
                 data_centre=(0, 0)
             )
             plot_contour(
                 axes[1, i],
-                support[:, shape[1] // 2, :],
+                in_support[:, shape[1] // 2, :],
                 color="k",
                 pixel_size=(voxel_size[0], voxel_size[2]),
                 data_centre=(0, 0)
             )
             plot_contour(
                 axes[2, i],
-                np.swapaxes(support[..., shape[2] // 2], axis1=0, axis2=1),
+                np.swapaxes(in_support[..., shape[2] // 2], axis1=0, axis2=1),
                 color="k",
                 pixel_size=(voxel_size[1], voxel_size[0]),
                 data_centre=(0, 0)
@@ -763,9 +763,9 @@ class SupportProcessor:
                     surface=np.load(f'{self.path_order}/surface.npy')
                 except:
                     print('No previous surface found')
-                    surface = (support 
-                                    - erosion(support).astype(int)
-                    )
+                    surface = (support
+                                    * ~erosion(support)
+                    ).astype(np.result_type(support, int), copy=False)
                     np.save(f'{self.path_order}/surface.npy', surface)
 
             elif self.params["method_det_support"]=='Amplitude_variation' :
@@ -795,9 +795,9 @@ class SupportProcessor:
                         surface=np.load(f'{self.path_order}/surface.npy')
                     except:
                         print('No previous surface found')
-                        surface = (support 
-                                        - erosion(support).astype(int)
-                        )
+                        surface = (support
+                                        * ~erosion(support)
+                        ).astype(np.result_type(support, int), copy=False)
                         np.save(f'{self.path_order}/surface.npy', 
                                 surface
                         )
@@ -823,9 +823,9 @@ class SupportProcessor:
                                                f'processed_surface.npy')
                     except:
                         print('No previous processed_surface found')
-                        p_surface = (p_support 
-                                          - erosion(p_support).astype(int)
-                        )
+                        p_surface = (p_support
+                                          * ~erosion(p_support)
+                        ).astype(np.result_type(p_support, int), copy=False)
                         np.save(f'{self.path_order}/processed_surface.npy',
                                 p_surface
                         )
@@ -840,9 +840,9 @@ class SupportProcessor:
 
         else :
             support = np.load(self.params["support_path"])
-            surface = (support 
-                            - erosion(support).astype(int)
-            )
+            surface = (support
+                            * ~erosion(support)
+            ).astype(np.result_type(support, int), copy=False)
             os.makedirs(f'{self.dump_dir}/surface_calculation/', exist_ok=True)
             np.save(f'{self.dump_dir}/surface_calculation/support.npy',
                     support
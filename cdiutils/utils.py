@@ -5,7 +5,6 @@ import warnings
 import numpy as np
 from numpy.fft import fftn, fftshift, ifftshift
 import matplotlib
-import seaborn as sns
 from scipy.ndimage import convolve, center_of_mass, median_filter
 from scipy.stats import gaussian_kde
 import textwrap
@@ -799,11 +798,6 @@ def find_isosurface(
         flattened_amplitude > background_value
     ]
 
-    # redo the histogram with the filtered amplitude
-    counts, bins = np.histogram(filtered_amplitude, bins=nbins, density=True)
-    bin_centres = (bins[:-1] + bins[1:]) / 2
-    bin_size = bin_centres[1] - bin_centres[0]
-
     # fit the amplitude distribution
     kernel = gaussian_kde(filtered_amplitude)
     x = np.linspace(0, 1, 1000)
@@ -823,6 +817,15 @@ def find_isosurface(
     isosurface = x[max_index] - sigma_criterion * sigma_estimate
 
     if plot or show:
+        # redo the histogram with the filtered amplitude, only needed
+        # for the plot
+        counts, bins = np.histogram(
+            filtered_amplitude, bins=nbins, density=True
+        )
+        # the bins have equal widths
+        bin_size = (bins[-1] - bins[0]) / nbins
+        bin_centres = bins[:-1] + bin_size / 2
+
         figsize = (5.812, 3.592)  # golden ratio
         fig, ax = matplotlib.pyplot.subplots(1, 1, figsize=figsize)
         ax.bar(
@@ -834,11 +837,11 @@ def find_isosurface(
             edgecolor=(0, 0, 0, 0.25),
             label=r"amplitude distribution"
         )
-        sns.kdeplot(
-            filtered_amplitude,
-            ax=ax,
+        # the density estimate has already been evaluated above
+        ax.fill_between(
+            x,
+            fitted_counts,
             alpha=0.3,
-            fill=True,
             color="navy",
             label=r"density estimate"
         )
@@ -1067,6 +1070,32 @@ def get_centred_slices(shape: tuple | list | np.ndarray) -> list:
     return slices
 
 
+def get_masked_centred_slices(
+        data: np.ndarray,
+        support: np.ndarray = None,
+        shape: tuple | list | np.ndarray = None
+) -> list:
+    """
+    Extract the central planes of the data and, if a support is
+    provided, multiply each of them by the matching support plane.
+    Only the planes are multiplied, no 3D temporary array is created.
+
+    Args:
+        data (np.ndarray): the data to extract the planes from.
+        support (np.ndarray, optional): the support (1 or np.nan
+            values) to apply to the planes. Defaults to None.
+        shape (tuple | list | np.ndarray, optional): the shape used
+            to find the centre of each axis. Defaults to data.shape.
+
+    Returns:
+        list: the list of the len(shape) central planes.
+    """
+    slices = get_centred_slices(data.shape if shape is None else shape)
+    if support is None:
+        return [data[s] for s in slices]
+    return [data[s] * support[s] for s in slices]
+
+
 def hot_pixel_filter(
         data: np.ndarray,
         threshold: float = 1e2,
@@ -18,15 +18,20 @@ setuptools.setup(
             "scripts/prepare_bcdi_notebooks.py",
             "scripts/prepare_parameter_files.py"
       ],
-      packages=setuptools.find_packages(),
+      packages=[
+            "cdiutils",
+            "cdiutils.load",
+            "cdiutils.multibcdi",
+            "cdiutils.plot",
+            "cdiutils.process",
+      ],
       package_data={
         'cdiutils': [
-            'process/pynx-id01cdi_template.slurm',
-            'examples/analyse_bcdi_data.ipynb',
-            'examples/step_by_step_bcdi_analysis.ipynb'
+            'process/*.slurm',
+            'examples/*.ipynb'
         ],
       },
-      include_package_data=True,
+      include_package_data=False,
       url="https://github.com/clatlan/cdiutils",
       python_requires=">=3.10",
       install_requires=[